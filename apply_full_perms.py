@@ -17,6 +17,7 @@ Options:
     --recursive    Process subdirectories recursively
     --backup       Create backup files before modifying
     --dry-run      Show what would be changed without making changes
+    --jobs N       Number of worker processes (default: one per CPU core)
     --help         Show this help message
 
 Examples:
@@ -28,13 +29,39 @@ Examples:
 import os
 import sys
 import argparse
+import bisect
+import io
+import logging
+import logging.handlers
+import multiprocessing
 import shutil
-import xml.etree.ElementTree as ET
 import re
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
+# Prefer lxml's C parser/serializer; fall back to the stdlib ElementTree
+try:
+    import lxml.etree as ET
+    HAVE_LXML = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+    HAVE_LXML = False
+
+# Shared lxml parser, built once per process and reused for every file.
+# Comments/PIs are dropped to match what the stdlib parser does, and ID
+# attributes aren't indexed since nothing looks elements up by ID.
+# (The stdlib XMLParser can't be reused, so None selects its default.)
+_PARSER = ET.XMLParser(remove_blank_text=False, remove_comments=True, remove_pis=True,
+                       huge_tree=False, collect_ids=False) if HAVE_LXML else None
+
+# Matching options for lxml's iterparse, which can't take a parser object
+_ITERPARSE_OPTIONS = {'remove_comments': True, 'remove_pis': True,
+                      'huge_tree': False, 'collect_ids': False} if HAVE_LXML else {}
+
+log = logging.getLogger('apply_full_perms')
+
 # Permission constants
 PERMISSIONS = {
     'max': {
@@ -51,6 +78,89 @@ PERMISSIONS = {
     }
 }
 
+# Inventory item permission fields and the PERMISSIONS key each one takes
+PERMISSION_FIELDS = (
+    ('BasePermissions', 'base'),
+    ('CurrentPermissions', 'current'),
+    ('EveryOnePermissions', 'everyone'),
+    ('NextPermissions', 'next')
+)
+
+# Additional fields to ensure proper configuration
+ADDITIONAL_FIELDS = {
+    'SaleType': '0',
+    'SalePrice': '0',
+    'GroupID': '00000000-0000-0000-0000-000000000000',
+    'GroupOwned': 'False'
+}
+#,
+#    'CreatorUUID': 'ospa:n=YourName Resident'
+
+# Define bits to clear (remove these flags)
+# Bit 12 (4096): No-modify  
+# Bit 13 (8192): No-transfer
+# Bit 21 (2097152): For sale
+# Bit 22 (4194304): For sale (additional)
+# Bit 23 (8388608): For sale (additional)
+# Bit 24 (16777216): For sale (additional)
+# Keep bit 8 (256): Container flag - DO NOT CLEAR (working examples have this)
+# Keep bit 20 (1048576): Container flag - DO NOT CLEAR
+# 0x1E00000 = bits 21-24 (2097152 + 4194304 + 8388608 + 16777216)
+# 0x3000 = bits 12-13 (4096 + 8192)
+FLAGS_BITS_TO_CLEAR = 0x1E3300  # 2097152 + 4194304 + 8388608 + 16777216 + 4096 + 8192 = 31469568
+FLAGS_CLEAR_MASK = ~FLAGS_BITS_TO_CLEAR
+
+# Flags value as raw bytes, for checking files without parsing them
+FLAGS_VALUE_PATTERN = re.compile(rb'<Flags>(\d+)</Flags>')
+
+# Result apply_permissions_to_xml() gives for files that aren't inventory items
+NOT_INVENTORY_ITEM = "Not an InventoryItem XML"
+
+# Declaration written to item files - OpenSim labels its utf-8 XML as utf-16
+XML_DECLARATION = '<?xml version="1.0" encoding="utf-16"?>\n'
+XML_DECLARATION_BYTES = XML_DECLARATION.encode('utf-8')
+
+# Every field we rewrite, as a byte alternation for the patterns below
+FIELD_NAMES_PATTERN = b'|'.join(name.encode() for name in
+                                [name for name, _ in PERMISSION_FIELDS] + list(ADDITIONAL_FIELDS) + ['Flags'])
+
+# One byte pattern matching every field we rewrite (group 1 is the field
+# name), so files can be patched in place with a single scan
+FIELD_PATTERN = re.compile(rb'<(%s)(?:>[^<]*</\1>|\s*/>)' % FIELD_NAMES_PATTERN)
+
+# Start tags of those fields, for counting where each one occurs
+FIELD_TAG_PATTERN = re.compile(rb'<(%s)[\s/>]' % FIELD_NAMES_PATTERN)
+
+# Markup whose contents the parser doesn't treat as elements
+HIDDEN_MARKUP = (b'<!--', b'<![CDATA[', b'<?')
+
+# Patterns that indicate auto-delete scripts: a permission check followed
+# by llDie on the same line.  Reported by these names in verbose output.
+SUSPICIOUS_PATTERNS = {
+    'PERM_TRANSFER': r'PERM_TRANSFER.*llDie',  # Transfer check -> die
+    'PERM_COPY': r'PERM_COPY.*llDie',  # Copy check -> die
+    'PERM_MODIFY': r'PERM_MODIFY.*llDie',  # Modify check -> die
+    'MASK_NEXT': r'MASK_NEXT.*llDie',  # Next owner perms -> die
+    'MASK_EVERYONE': r'MASK_EVERYONE.*llDie',  # Everyone perms -> die
+}
+PERM_CHECKS = ('PERM_TRANSFER', 'PERM_COPY', 'PERM_MODIFY')
+
+# Every keyword the suspicious patterns are built from, so a script is
+# scanned once instead of once per pattern (the keywords can't overlap)
+SCRIPT_TOKEN_PATTERN = re.compile(
+    r'(?P<lldie>llDie)(?P<call>\s*\()?|(?P<check>%s)' % '|'.join(SUSPICIOUS_PATTERNS),
+    re.IGNORECASE
+)
+
+# Tag written into the scripts sanitize_lsl_scripts() disables, both in the
+# header at the top and on each commented-out line. The header is how
+# sanitized scripts are recognised, so only the start of a script is checked.
+SANITIZED_MARKER = 'DISABLED BY IAR FIXER'
+SANITIZED_HEADER_SPAN = 256
+
+# Asset UUID as it appears in script file names (8-4-4-4-12 hex digits)
+UUID_PATTERN = re.compile(r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}')
+
 def parse_arguments():
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(
@@ -82,6 +192,8 @@ def parse_arguments():
                        help='Show detailed output')
     parser.add_argument('--no-confirm', action='store_true',
                        help='Skip confirmation prompt')
+    parser.add_argument('--jobs', '-j', type=int, default=None,
+                       help='Number of worker processes (default: one per CPU core)')
     
     return parser.parse_args()
 
@@ -98,192 +210,364 @@ def get_permission_values(args):
     
     return perms
 
+def get_target_fields(permissions):
+    """
+    Map each inventory item field to the text it should hold.
+    Built once per run so the per-file loop only compares strings.
+    """
+    target_fields = {name: str(permissions[key]) for name, key in PERMISSION_FIELDS}
+    target_fields.update(ADDITIONAL_FIELDS)
+    return target_fields
+
+def make_field_updater(permissions, verbose=False):
+    """
+    Build update_fields(root, dry_run) with this run's target values bound in.
+    It returns (changes_made, flags_field, new_values).
+    """
+    target_fields = get_target_fields(permissions)
+    
+    def update_fields(root, dry_run):
+        changes_made = []
+        new_values = {}
+        
+        # Walk the children once, dispatching on tag, instead of a find()
+        # per field. Fields are popped once handled so that, like find(),
+        # only the first occurrence of each is touched.
+        pending_fields = target_fields.copy()
+        flags_field = None
+        for field in root:
+            field_name = field.tag
+            if field_name == 'Flags':
+                if flags_field is None:
+                    flags_field = field
+                continue
+            new_value = pending_fields.pop(field_name, None)
+            if new_value is not None:
+                old_value = field.text
+                if old_value != new_value:
+                    if not dry_run:
+                        field.text = new_value
+                    new_values[field_name] = new_value
+                    changes_made.append(f"{field_name}: {old_value} -> {new_value}" if verbose else field_name)
+        
+        return changes_made, flags_field, new_values
+    
+    return update_fields
+
+def make_applied_check(permissions):
+    """
+    Build is_applied(raw), true when a file's bytes already hold every target
+    value, so re-runs can skip parsing it. A miss just means a full parse.
+    """
+    markers = [f"<{name}>{value}</{name}>".encode('utf-8')
+               for name, value in get_target_fields(permissions).items()]
+    
+    def is_applied(raw):
+        if not all(marker in raw for marker in markers):
+            return False
+        # Each marker must be the field's only occurrence, outside any
+        # markup that could hide it from the parser
+        body = strip_xml_declaration(raw)
+        if any(markup in body for markup in HIDDEN_MARKUP):
+            return False
+        field_tags = FIELD_TAG_PATTERN.findall(body)
+        if len(field_tags) != len(set(field_tags)):
+            return False
+        flags_match = FLAGS_VALUE_PATTERN.search(raw)
+        if flags_match is None:
+            return b'<Flags' not in raw
+        return not int(flags_match.group(1)) & FLAGS_BITS_TO_CLEAR
+    
+    return is_applied
+
 def get_recursive_setting(args):
     """Get the recursive setting based on arguments."""
     if args.no_recursive:
         return False
     return True  # Default to True
 
-def find_xml_files(folder_path, recursive=False):
-    """Find all XML files in the given folder."""
-    xml_files = []
-    folder = Path(folder_path)
-    
-    if not folder.exists():
-        print(f"Error: Folder '{folder_path}' does not exist.")
-        return []
-    
-    if recursive:
-        pattern = "**/*.xml"
-    else:
-        pattern = "*.xml"
-    
-    for xml_file in folder.glob(pattern):
-        if xml_file.is_file():
-            xml_files.append(xml_file)
+def iter_xml_files(folder_path, recursive=False):
+    """
+    Yield the paths of the XML files in the given folder, in directory order.
+    Folders that can't be listed are reported and skipped.
+    """
+    if not os.path.exists(folder_path):
+        log.error(f"Error: Folder '{folder_path}' does not exist.")
+        return
+    if not os.path.isdir(folder_path):
+        return
     
-    return sorted(xml_files)
+    pending = [folder_path]
+    while pending:
+        folder = pending.pop()
+        try:
+            entries = os.scandir(folder)
+        except OSError as e:
+            log.warning(f"Warning: Skipping folder '{folder}': {e}")
+            continue
+        # main() feeds this walk straight into the worker pool, so an error
+        # escaping here would end the pass partway through
+        with entries:
+            try:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            pending.append(entry.path)
+                    elif os.path.normcase(entry.name).endswith('.xml') and entry.is_file():
+                        yield entry.path
+            except OSError as e:
+                log.warning(f"Warning: Stopped listing folder '{folder}': {e}")
 
 def backup_file(file_path):
-    """Create a backup of the file."""
+    """Create a backup of the file, as a hardlink where possible."""
     backup_path = file_path.with_suffix('.xml.backup')
-    shutil.copy2(file_path, backup_path)
+    # Sharing the inode is safe: write_file_atomic() never rewrites in place
+    try:
+        os.link(file_path, backup_path)
+    except OSError:
+        shutil.copy2(file_path, backup_path)
     return backup_path
 
-def is_inventory_item_xml(file_path):
-    """Check if the XML file is an OpenSim inventory item."""
+def write_file_atomic(file_path, data):
+    """
+    Write bytes to a temp file beside file_path, then swap it into place.
+    An interrupted run can't leave a half-written file behind.
+    """
+    tmp_path = file_path.with_name(file_path.name + '.tmp')
     try:
-        # Try different encodings since IAR files can have encoding issues
-        encodings = ['utf-8', 'utf-16', 'latin-1', 'cp1252']
-        
-        for encoding in encodings:
-            try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    content = f.read()
-                    # Remove the encoding declaration to avoid conflicts
-                    if content.startswith('<?xml'):
-                        lines = content.split('\n', 1)
-                        if len(lines) > 1:
-                            content = lines[1]
-                    root = ET.fromstring(content)
-                    return root.tag == 'InventoryItem'
-            except (UnicodeDecodeError, ET.ParseError):
-                continue
-        
-        return False
-    except Exception:
-        return False
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        shutil.copymode(file_path, tmp_path)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if tmp_path.exists():
+            tmp_path.unlink()
+        raise
+
+def detect_encoding(raw):
+    """Guess a file's encoding from its BOM; plain files are tried as utf-8 first."""
+    if raw[:2] in (b'\xff\xfe', b'\xfe\xff'):
+        return 'utf-16'
+    if raw[:3] == b'\xef\xbb\xbf':
+        return 'utf-8-sig'
+    return 'utf-8'
+
+def decode_bytes(raw):
+    """
+    Decode raw file bytes, sniffing the encoding from the BOM.
+    The usual trial-and-error list is only walked if that guess fails.
+    Returns (content, encoding), or (None, None) if nothing could decode it.
+    """
+    # Try different encodings since IAR files can have encoding issues
+    detected = detect_encoding(raw)
+    encodings = [detected] + [e for e in ['utf-8', 'utf-16', 'latin-1', 'cp1252'] if e != detected]
+    
+    for encoding in encodings:
+        try:
+            return raw.decode(encoding), encoding
+        except UnicodeDecodeError:
+            continue
+    
+    return None, None
+
+def strip_xml_declaration(content):
+    """Remove a leading <?xml ...?> declaration from str or bytes content."""
+    if isinstance(content, bytes):
+        if content.startswith(b'<?xml'):
+            content = content.partition(b'?>')[2]
+    elif content.startswith('<?xml'):
+        content = content.partition('?>')[2]
+    return content
+
+def parse_xml_body(data):
+    """Parse a document body with the shared parser and return its root."""
+    return ET.fromstring(data, _PARSER)
+
+def parse_xml_bytes(raw, parse=parse_xml_body):
+    """
+    Parse raw XML file bytes and return the root element (or parse's result).
+    OpenSim declares utf-16 but writes utf-8, so the declaration is dropped first.
+    """
+    if detect_encoding(raw) == 'utf-8':
+        try:
+            return parse(strip_xml_declaration(raw))
+        except ET.ParseError:
+            pass  # Possibly not utf-8 after all - retry from decoded text
+    
+    content, _ = decode_bytes(raw)
+    if content is None:
+        raise ValueError("Could not read file with any encoding")
+    return parse(strip_xml_declaration(content).encode('utf-8'))
+
+# Root tag of inventory item files as raw bytes (utf-8 and both utf-16 byte orders)
+INVENTORY_ITEM_TAGS = tuple('<InventoryItem'.encode(e) for e in ('utf-8', 'utf-16-le', 'utf-16-be'))
+
+def has_inventory_item_tag(raw):
+    """
+    Cheap byte-level pre-check before parsing.
+    IAR inventory item files open with the <InventoryItem> tag, so a file
+    without it in the first 512 bytes can't be one and needn't be parsed.
+    """
+    head = raw[:512]
+    return any(tag in head for tag in INVENTORY_ITEM_TAGS)
+
+def read_inventory_item_bytes(file_path):
+    """
+    Read a file's bytes, or return None if its first 512 bytes show it
+    can't be an inventory item.
+    """
+    with open(file_path, 'rb', buffering=0) as f:
+        head = f.read(512)
+        if not has_inventory_item_tag(head):
+            return None
+        return head + f.read()
+
+def peek_root_tag(data):
+    """Return the root element's tag, parsing no further than its start tag."""
+    events = ET.iterparse(io.BytesIO(data), events=('start',), **_ITERPARSE_OPTIONS)
+    return next(events)[1].tag
+
+def parse_inventory_item(raw):
+    """
+    Parse raw XML file bytes if they hold an inventory item.
+    Returns the root element, or None for any other document.
+    """
+    if not has_inventory_item_tag(raw):
+        return None
+    
+    body = strip_xml_declaration(raw).lstrip()
+    if not body.startswith(b'<InventoryItem') and detect_encoding(raw) == 'utf-8':
+        try:
+            if peek_root_tag(body) != 'InventoryItem':
+                return None
+        except ET.ParseError:
+            pass  # Let the full parse below retry or report it
+    
+    root = parse_xml_bytes(raw)
+    return root if root.tag == 'InventoryItem' else None
 
-def apply_permissions_to_xml(file_path, permissions, dry_run=False, verbose=False):
-    """Apply permissions to a single XML file."""
+def patch_xml_fields(raw, new_values):
+    """
+    Rewrite the changed field values directly in a utf-8 item file's bytes.
+    Returns None when that can't be done safely, so the caller can serialize
+    the tree instead.
+    """
+    if detect_encoding(raw) != 'utf-8':
+        return None
     try:
-        # Try different encodings since IAR files can have encoding issues
-        encodings = ['utf-8', 'utf-16', 'latin-1', 'cp1252']
-        content = None
-        used_encoding = None
-        
-        for encoding in encodings:
-            try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    content = f.read()
-                    used_encoding = encoding
-                    break
-            except UnicodeDecodeError:
-                continue
-        
-        if content is None:
-            return False, "Could not read file with any encoding"
-        
-        # Remove the encoding declaration to avoid conflicts
-        original_declaration = None
-        if content.startswith('<?xml'):
-            lines = content.split('\n', 1)
-            if len(lines) > 1:
-                original_declaration = lines[0]
-                content = lines[1]
-        
-        root = ET.fromstring(content)
+        raw.decode('utf-8')
+    except UnicodeDecodeError:
+        return None
+    
+    # A field's only start tag must be the element update_fields() changed
+    body = strip_xml_declaration(raw).lstrip()
+    if any(markup in body for markup in HIDDEN_MARKUP):
+        return None
+    field_tags = FIELD_TAG_PATTERN.findall(body)
+    if any(field_tags.count(name.encode()) != 1 for name in new_values):
+        return None
+    
+    # Single pass over the bytes, replacing each changed field's one occurrence
+    pending_values = dict(new_values)
+    
+    def replace_field(match):
+        field_name = match.group(1).decode('ascii')
+        new_value = pending_values.pop(field_name, None)
+        if new_value is None:
+            return match.group(0)
+        return f"<{field_name}>{new_value}</{field_name}>".encode('utf-8')
+    
+    body = FIELD_PATTERN.sub(replace_field, body)
+    if pending_values:
+        return None
+    
+    return XML_DECLARATION_BYTES + body
+
+def apply_permissions_to_xml(file_path, permissions, dry_run=False, verbose=False, backup=False,
+                             update_fields=None, is_applied=None):
+    """
+    Apply permissions to a single XML file, skipping non-InventoryItem files.
+    Callers handling many files can pass update_fields from
+    make_field_updater() and is_applied from make_applied_check().
+    """
+    if update_fields is None:
+        update_fields = make_field_updater(permissions, verbose)
+    if is_applied is None:
+        is_applied = make_applied_check(permissions)
+    file_path = Path(file_path)
+    try:
+        raw = read_inventory_item_bytes(file_path)
         
-        if root.tag != 'InventoryItem':
+        # Files a previous run already fixed don't need parsing at all
+        if raw is not None and is_applied(raw):
             if verbose:
-                print(f"Skipping {file_path.name} - not an InventoryItem XML")
-            return False, "Not an InventoryItem XML"
-        
-        changes_made = []
-        
-        # Apply permissions to each permission field
-        permission_fields = {
-            'BasePermissions': permissions['base'],
-            'CurrentPermissions': permissions['current'],
-            'EveryOnePermissions': permissions['everyone'],
-            'NextPermissions': permissions['next']
-        }
+                log.info(f"No changes needed for {file_path.name}")
+            return False, "No changes needed (already applied)"
         
-        # Apply additional fields to ensure proper configuration
-        additional_fields = {
-            'SaleType': '0',
-            'SalePrice': '0',
-            'GroupID': '00000000-0000-0000-0000-000000000000',
-            'GroupOwned': 'False'
-        }
-		#,
-        #    'CreatorUUID': 'ospa:n=YourName Resident'
+        root = parse_inventory_item(raw) if raw is not None else None
         
-        # Apply permission changes
-        for field_name, new_value in permission_fields.items():
-            field = root.find(field_name)
-            if field is not None:
-                old_value = field.text
-                if old_value != str(new_value):
-                    if not dry_run:
-                        field.text = str(new_value)
-                    changes_made.append(f"{field_name}: {old_value} -> {new_value}")
+        if root is None:
+            if verbose:
+                log.info(f"Skipping {file_path.name} - not an InventoryItem XML")
+            return False, NOT_INVENTORY_ITEM
         
-        # Apply additional field changes
-        for field_name, new_value in additional_fields.items():
-            field = root.find(field_name)
-            if field is not None:
-                old_value = field.text
-                if old_value != str(new_value):
-                    if not dry_run:
-                        field.text = str(new_value)
-                    changes_made.append(f"{field_name}: {old_value} -> {new_value}")
+        changes_made, flags_field, new_values = update_fields(root, dry_run)
         
         # Apply Flags bitwise operations to remove unwanted flags
-        flags_field = root.find('Flags')
         if flags_field is not None:
             try:
                 old_flags = int(flags_field.text)
-                
-                # Define bits to clear (remove these flags)
-                # Bit 12 (4096): No-modify  
-                # Bit 13 (8192): No-transfer
-                # Bit 21 (2097152): For sale
-                # Bit 22 (4194304): For sale (additional)
-                # Bit 23 (8388608): For sale (additional)
-                # Bit 24 (16777216): For sale (additional)
-                # Keep bit 8 (256): Container flag - DO NOT CLEAR (working examples have this)
-                # Keep bit 20 (1048576): Container flag - DO NOT CLEAR
-                # 0x1E00000 = bits 21-24 (2097152 + 4194304 + 8388608 + 16777216)
-                # 0x3000 = bits 12-13 (4096 + 8192)
-                bits_to_clear = 0x1E3300  # 2097152 + 4194304 + 8388608 + 16777216 + 4096 + 8192 = 31469568
-                
-                new_flags = old_flags & ~bits_to_clear
+                new_flags = old_flags & FLAGS_CLEAR_MASK
                 
                 if old_flags != new_flags:
+                    new_values['Flags'] = str(new_flags)
                     if not dry_run:
-                        flags_field.text = str(new_flags)
-                    changes_made.append(f"Flags: {old_flags} -> {new_flags} (cleared bits 12-13, 21-24, preserved bit 8)")
+                        flags_field.text = new_values['Flags']
+                    if verbose:
+                        changes_made.append(f"Flags: {old_flags} -> {new_flags} (cleared bits 12-13, 21-24, preserved bit 8)")
+                    else:
+                        changes_made.append('Flags')
                     
             except ValueError:
                 # If flags field is not a valid integer, skip it
                 if verbose:
-                    print(f"Warning: Invalid Flags value '{flags_field.text}' in {file_path.name}")
+                    log.warning(f"Warning: Invalid Flags value '{flags_field.text}' in {file_path.name}")
                 pass
         
         if changes_made:
             if not dry_run:
-                # Reconstruct the XML with proper formatting
-                tree = ET.ElementTree(root)
+                # Patch the changed values straight into the original bytes
+                new_raw = patch_xml_fields(raw, new_values)
+                
+                if new_raw is None:
+                    # Serialize straight to UTF-8 bytes behind the original declaration.
+                    # This preserves the "utf-16" declaration in the XML while actually saving as UTF-8
+                    new_raw = XML_DECLARATION_BYTES + ET.tostring(root, encoding='utf-8')
+                
+                # Nothing to write if the result is byte-identical to the input
+                if new_raw == raw:
+                    if verbose:
+                        log.info(f"No byte-level changes for {file_path.name}")
+                    return False, "No byte-level changes"
                 
-                # Create the XML content with original declaration but save as UTF-8
-                # This preserves the "utf-16" declaration in the XML while actually saving as UTF-8
-                xml_content = '<?xml version="1.0" encoding="utf-16"?>\n'
-                xml_content += ET.tostring(root, encoding='unicode')
+                # Create backup if requested
+                if backup:
+                    backup_path = backup_file(file_path)
+                    if verbose:
+                        log.info(f"Created backup: {backup_path.name}")
                 
                 # Write the file as UTF-8 (without BOM) but keep the utf-16 declaration
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(xml_content)
+                write_file_atomic(file_path, new_raw)
             
             if verbose:
-                print(f"Modified {file_path.name}:")
+                log.info(f"Modified {file_path.name}:")
                 for change in changes_made:
-                    print(f"  {change}")
+                    log.info(f"  {change}")
             
             return True, changes_made
         else:
             if verbose:
-                print(f"No changes needed for {file_path.name}")
+                log.info(f"No changes needed for {file_path.name}")
             return False, "No changes needed"
             
     except ET.ParseError as e:
@@ -291,206 +575,363 @@ def apply_permissions_to_xml(file_path, permissions, dry_run=False, verbose=Fals
     except Exception as e:
         return False, f"Error processing file: {e}"
 
-def sanitize_lsl_scripts(folder_path, dry_run=False, verbose=False):
+# Per-process settings for _process_xml_file, set by _init_worker
+_WORKER_SETTINGS = None
+
+# Holds log records in pool workers until they're handed back to main()
+_WORKER_LOG_BUFFER = None
+
+def _init_worker(permissions, dry_run, verbose, backup, buffer_log=False):
+    """
+    Store the run settings in a worker process.
+    With buffer_log=True log messages are returned with each result instead.
+    """
+    global _WORKER_SETTINGS, _WORKER_LOG_BUFFER
+    _WORKER_SETTINGS = (permissions, dry_run, verbose, backup,
+                        make_field_updater(permissions, verbose), make_applied_check(permissions))
+    
+    if buffer_log:
+        _WORKER_LOG_BUFFER = logging.handlers.BufferingHandler(capacity=float('inf'))
+        log.addHandler(_WORKER_LOG_BUFFER)
+        log.setLevel(logging.DEBUG)
+        log.propagate = False
+
+def _drain_worker_log():
+    """Return and clear this worker's buffered (level, message) pairs."""
+    if _WORKER_LOG_BUFFER is None:
+        return []
+    messages = [(record.levelno, record.getMessage()) for record in _WORKER_LOG_BUFFER.buffer]
+    _WORKER_LOG_BUFFER.buffer.clear()
+    return messages
+
+def _process_xml_file(xml_file):
+    """Update a single XML file (runs in a worker process)."""
+    permissions, dry_run, verbose, backup, update_fields, is_applied = _WORKER_SETTINGS
+    success, result = apply_permissions_to_xml(xml_file, permissions, dry_run, verbose, backup,
+                                               update_fields, is_applied)
+    return xml_file, success, result, _drain_worker_log()
+
+def find_suspicious_patterns(content):
+    """
+    Scan script text once for auto-delete patterns.
+    Returns (llDie() call matches, list of matched pattern descriptions).
+    """
+    lldie_calls = []
+    line_checks = {}  # check keyword -> position of its latest occurrence
+    matched = set()
+    perm_check_seen = False
+    
+    for match in SCRIPT_TOKEN_PATTERN.finditer(content):
+        check = match.group('check')
+        if check:
+            check = check.upper()
+            line_checks[check] = match.start()
+            perm_check_seen = perm_check_seen or check in PERM_CHECKS
+            continue
+        
+        if match.group('call') is not None:
+            lldie_calls.append(match)
+        line_start = content.rfind('\n', 0, match.start()) + 1
+        for check, position in line_checks.items():
+            if position >= line_start:
+                matched.add(check)
+        if perm_check_seen:
+            matched.add('permission_check_then_die')
+    
+    matched_patterns = []
+    if lldie_calls:
+        matched_patterns.append(f'llDie() calls found: {len(lldie_calls)}')
+    matched_patterns.extend(pattern for check, pattern in SUSPICIOUS_PATTERNS.items() if check in matched)
+    if 'permission_check_then_die' in matched:
+        matched_patterns.append('permission_check_then_die')
+    return lldie_calls, matched_patterns
+
+def write_lsl_script(script_file, content):
+    """Write a script back as UTF-8 with LF line endings."""
+    with open(script_file, 'w', encoding='utf-8', newline='\n') as f:
+        f.write(content)
+
+def sanitize_lsl_script(script_file, dry_run=False, verbose=False, pending_writes=None):
+    """
+    Disable one LSL script if it auto-deletes items based on permissions.
+    Returns (suspicious, marked), marked meaning it carries the sanitized
+    header. Given pending_writes, rewrites are queued there, not written.
+    """
+    try:
+        # Read once and decode (BOM sniffing, then multiple encodings)
+        content, used_encoding = decode_bytes(script_file.read_bytes())
+        
+        if content is None:
+            if verbose:
+                log.warning(f"Could not read {script_file.name} with any encoding")
+            return False, False
+        
+        # Normalise newlines the way text-mode reading used to
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+        
+        # Remove null bytes that can cause script reset issues
+        original_content = content
+        content = content.replace('\x00', '')
+        had_null_bytes = (original_content != content)
+        
+        # Check if this script contains llDie() calls or permission
+        # checks followed by llDie
+        llDie_matches, matched_patterns = find_suspicious_patterns(content)
+        is_suspicious = bool(matched_patterns)
+        
+        if is_suspicious:
+            if verbose:
+                log.info(f"⚠️  Suspicious script detected: {script_file.name}")
+                log.info(f"   Matched patterns: {', '.join(matched_patterns)}")
+                if had_null_bytes:
+                    log.info(f"   Removed null bytes from script")
+            
+            if not dry_run:
+                # Simple approach: comment out problematic lines
+                # Split into lines to make replacements easier
+                lines = content.split('\n')
+                changes_made = []
+                lines_to_comment = set()
+                
+                # Offset each line starts at, so matches can be mapped to lines
+                line_starts = [0]
+                for line in lines[:-1]:
+                    line_starts.append(line_starts[-1] + len(line) + 1)
+                
+                # Find and comment out llDie() calls and their containing if statements
+                for match in llDie_matches:
+                    start_pos = match.start()
+                    line_num = bisect.bisect_right(line_starts, start_pos) - 1
+                    if line_num < len(lines):
+                        line = lines[line_num]
+                        if not line.strip().startswith('//') and 'llDie' in line:
+                            # Comment out the llDie line
+                            lines_to_comment.add(line_num)
+                            changes_made.append(f"llDie() call")
+                            
+                            # Look backwards for the if statement
+                            for prev_line_num in range(line_num - 1, max(-1, line_num - 5), -1):
+                                if prev_line_num < 0:
+                                    break
+                                prev_line = lines[prev_line_num].strip()
+                                if not prev_line or prev_line.startswith('//'):
+                                    continue
+                                if (prev_line.startswith('if') and 
+                                    ('PERM_' in prev_line or 'MASK_' in prev_line) and
+                                    not prev_line.startswith('//')):
+                                    lines_to_comment.add(prev_line_num)
+                                    changes_made.append(f"if statement with permission check")
+                                    break
+                                if prev_line.startswith('}') or 'function' in prev_line.lower():
+                                    break
+                
+                # Find and comment out CheckPerms() calls (not function definitions)
+                for i, line in enumerate(lines):
+                    stripped = line.strip()
+                    if 'CheckPerms' in stripped and '(' in stripped and not stripped.startswith('//'):
+                        # It's a call if it's not a function definition (no opening brace on same/next line)
+                        is_definition = False
+                        if '{' in line:
+                            is_definition = True
+                        else:
+                            # Check next few lines for opening brace
+                            for j in range(i + 1, min(i + 3, len(lines))):
+                                if '{' in lines[j] and not lines[j].strip().startswith('//'):
+                                    is_definition = True
+                                    break
+                                if lines[j].strip() and not lines[j].strip().startswith('//'):
+                                    break
+                        
+                        if not is_definition:
+                            lines_to_comment.add(i)
+                            changes_made.append(f"CheckPerms() call")
+                
+                # Note: We intentionally do NOT comment out llResetScript() calls
+                # because they help reset the script state and force reload of sanitized code
+                
+                # Comment out all identified lines
+                for line_num in sorted(lines_to_comment, reverse=True):
+                    line = lines[line_num]
+                    indentation = len(line) - len(line.lstrip())
+                    commented_line = ' ' * indentation + f'// {SANITIZED_MARKER}: ' + line.lstrip()
+                    lines[line_num] = commented_line
+                
+                # Reconstruct the content
+                sanitized_content = '\n'.join(lines)
+                
+                # Add header comment if we made changes
+                if changes_made:
+                    unique_changes = list(set(changes_made))  # Remove duplicates
+                    header = f"/* {SANITIZED_MARKER} - Auto-delete script detected\n"
+                    header += f"   Disabled: {', '.join(unique_changes)}\n"
+                    if had_null_bytes:
+                        header += "   Removed null bytes\n"
+                    header += "*/\n\n"
+                    sanitized_content = header + sanitized_content
+                
+                # Write back with the same encoding we used to read, but always as UTF-8 to avoid null bytes
+                if pending_writes is None:
+                    write_lsl_script(script_file, sanitized_content)
+                else:
+                    pending_writes.append((script_file, sanitized_content))
+                content = sanitized_content
+                
+                if verbose:
+                    log.info(f"   ✓ Disabled {len(llDie_matches)} llDie() call(s)")
+                    if had_null_bytes:
+                        log.info(f"   ✓ Removed null bytes")
+            
+            return True, SANITIZED_MARKER in content[:SANITIZED_HEADER_SPAN]
+        elif had_null_bytes:
+            # Even if not suspicious, remove null bytes
+            if not dry_run:
+                if pending_writes is None:
+                    write_lsl_script(script_file, content)
+                else:
+                    pending_writes.append((script_file, content))
+                if verbose:
+                    log.info(f"✓ Cleaned null bytes from {script_file.name}")
+        elif verbose:
+            log.info(f"✓ Safe script: {script_file.name}")
+        
+        return False, SANITIZED_MARKER in content[:SANITIZED_HEADER_SPAN]
+            
+    except Exception as e:
+        if verbose:
+            log.error(f"Error processing {script_file.name}: {e}")
+    
+    return False, False
+
+def sanitize_lsl_scripts(folder_path, dry_run=False, verbose=False, pending_writes=None):
     """
     Scan for and disable LSL scripts that auto-delete items based on permissions.
     Detects scripts that call llDie() when certain permissions are detected.
+    Returns (suspicious count, frozenset of sanitized .lsl script UUIDs).
     """
-    # Patterns that indicate auto-delete scripts
-    suspicious_patterns = [
-        r'llDie\s*\(',  # llDie() calls
-        r'PERM_TRANSFER.*llDie',  # Transfer check -> die
-        r'PERM_COPY.*llDie',  # Copy check -> die
-        r'PERM_MODIFY.*llDie',  # Modify check -> die
-        r'MASK_NEXT.*llDie',  # Next owner perms -> die
-        r'MASK_EVERYONE.*llDie',  # Everyone perms -> die
-    ]
-    
     # Find all .lsl files in assets directory
     assets_dir = Path(folder_path) / 'assets'
     if not assets_dir.exists():
         if verbose:
-            print(f"Assets directory not found: {assets_dir}")
-        return 0
+            log.info(f"Assets directory not found: {assets_dir}")
+        return 0, frozenset()
     
-    lsl_files = list(assets_dir.glob('*.lsl'))
+    # List the directory once and sort the entries by extension
+    with os.scandir(assets_dir) as it:
+        entries = [Path(entry.path) for entry in it if entry.is_file()]
+    lsl_files = [f for f in entries if f.suffix == '.lsl']
     # Also check for text files that might be scripts (some IARs don't use .lsl extension)
     # But be conservative - only process if they contain LSL keywords
     text_files = []
-    for ext in ['', '.txt']:
-        for f in assets_dir.glob(f'*{ext}'):
-            if f.is_file() and f not in lsl_files:
-                try:
-                    with open(f, 'r', encoding='utf-8', errors='ignore') as test_file:
-                        content = test_file.read(500)  # Read first 500 chars
-                        if 'll' in content.lower() and ('function' in content.lower() or 'default' in content.lower()):
-                            text_files.append(f)
-                except:
-                    pass
+    for f in entries:
+        if f.suffix in ('', '.txt'):
+            try:
+                with open(f, 'rb') as test_file:
+                    content = test_file.read(500).decode('utf-8', errors='ignore').lower()  # Read first 500 bytes
+                    if 'll' in content and ('function' in content or 'default' in content):
+                        text_files.append(f)
+            except OSError:
+                pass
     
     all_script_files = lsl_files + text_files
-    disabled_count = 0
     
-    for script_file in all_script_files:
+    # Scripts are independent and mostly file I/O, so they're handled on a
+    # thread pool. Verbose runs stay sequential to keep each script's report
+    # together and in order.
+    if verbose:
+        results = [sanitize_lsl_script(f, dry_run, verbose, pending_writes) for f in all_script_files]
+    else:
+        with ThreadPoolExecutor() as executor:
+            results = list(executor.map(sanitize_lsl_script, all_script_files,
+                                        [dry_run] * len(all_script_files),
+                                        [verbose] * len(all_script_files),
+                                        [pending_writes] * len(all_script_files)))
+    
+    disabled_count = sum(suspicious for suspicious, _ in results)
+    # The .lsl files come first in all_script_files, so zip pairs them up
+    sanitized_uuids = frozenset(filter(None, (get_script_uuid(script_file)
+                                              for script_file, (_, marked) in zip(lsl_files, results)
+                                              if marked)))
+    return disabled_count, sanitized_uuids
+
+def write_lsl_scripts(pending_writes, verbose=False):
+    """Write out the script rewrites collected by sanitize_lsl_scripts()."""
+    for script_file, content in pending_writes:
         try:
-            # Try multiple encodings
-            encodings = ['utf-8', 'utf-16', 'latin-1', 'cp1252']
-            content = None
-            used_encoding = None
-            
-            for encoding in encodings:
-                try:
-                    with open(script_file, 'r', encoding=encoding) as f:
-                        content = f.read()
-                        used_encoding = encoding
-                        break
-                except UnicodeDecodeError:
-                    continue
-            
-            if content is None:
-                if verbose:
-                    print(f"Could not read {script_file.name} with any encoding")
+            write_lsl_script(script_file, content)
+        except OSError as e:
+            if verbose:
+                log.error(f"Error processing {script_file.name}: {e}")
+
+def get_script_uuid(script_file):
+    """Return the asset UUID from a .lsl script's file name, or None."""
+    # Extract UUID from filename (format: UUID_script.lsl)
+    name = script_file.name
+    uuid_part = name[:-len('_script.lsl')] if name.endswith('_script.lsl') else name[:-len('.lsl')]
+    if not UUID_PATTERN.fullmatch(uuid_part):
+        return None
+    return uuid_part
+
+# lxml elements know their parent, and lxml can pick out the
+# SavedScriptState elements itself, so only their end events reach Python.
+# The stdlib build tracks the open elements from start events instead.
+# Object XMLs come from local exports and can carry text nodes past lxml's
+# default 10 MB limit, so huge_tree is allowed for them.
+if HAVE_LXML:
+    _SCRIPT_STATE_ITERPARSE = dict(_ITERPARSE_OPTIONS, huge_tree=True,
+                                   events=('end',), tag='{*}SavedScriptState')
+else:
+    _SCRIPT_STATE_ITERPARSE = {'events': ('start', 'end')}
+
+def make_script_state_remover(sanitized_script_uuids):
+    """
+    Build a parse for parse_xml_bytes() that drops sanitized scripts'
+    SavedScriptState elements, returning (root, cleared script UUIDs).
+    """
+    def parse(data):
+        parents = []  # Open elements, for stdlib elements that can't find their parent
+        cleared = []
+        events = ET.iterparse(io.BytesIO(data), **_SCRIPT_STATE_ITERPARSE)
+        for event, elem in events:
+            if event == 'start':
+                parents.append(elem)
+                continue
+            if not HAVE_LXML:
+                parents.pop()
+            if elem.tag.rpartition('}')[2] != 'SavedScriptState':
                 continue
             
-            # Remove null bytes that can cause script reset issues
-            original_content = content
-            content = content.replace('\x00', '')
-            had_null_bytes = (original_content != content)
-            
-            # Check if this script contains suspicious patterns
-            is_suspicious = False
-            matched_patterns = []
-            
-            # Check for llDie() calls (most direct indicator)
-            llDie_matches = list(re.finditer(r'llDie\s*\(', content, re.IGNORECASE))
-            if llDie_matches:
-                is_suspicious = True
-                matched_patterns.append(f'llDie() calls found: {len(llDie_matches)}')
-            
-            # Check for permission checks followed by llDie
-            for pattern in suspicious_patterns[1:]:  # Skip the first one (llDie) as we already checked
-                if re.search(pattern, content, re.IGNORECASE | re.MULTILINE):
-                    is_suspicious = True
-                    matched_patterns.append(pattern)
-            
-            # Additional check: look for the specific pattern from the example
-            # Check for permission mask checks followed by llDie
-            if re.search(r'(PERM_TRANSFER|PERM_COPY|PERM_MODIFY).*?llDie', content, re.IGNORECASE | re.DOTALL):
-                is_suspicious = True
-                if 'permission_check_then_die' not in matched_patterns:
-                    matched_patterns.append('permission_check_then_die')
-            
-            if is_suspicious:
-                if verbose:
-                    print(f"⚠️  Suspicious script detected: {script_file.name}")
-                    print(f"   Matched patterns: {', '.join(matched_patterns)}")
-                    if had_null_bytes:
-                        print(f"   Removed null bytes from script")
-                
-                if not dry_run:
-                    # Simple approach: comment out problematic lines
-                    # Split into lines to make replacements easier
-                    lines = content.split('\n')
-                    changes_made = []
-                    lines_to_comment = set()
-                    
-                    # Find and comment out llDie() calls and their containing if statements
-                    for match in llDie_matches:
-                        start_pos = match.start()
-                        line_num = content[:start_pos].count('\n')
-                        if line_num < len(lines):
-                            line = lines[line_num]
-                            if not line.strip().startswith('//') and 'llDie' in line:
-                                # Comment out the llDie line
-                                lines_to_comment.add(line_num)
-                                changes_made.append(f"llDie() call")
-                                
-                                # Look backwards for the if statement
-                                for prev_line_num in range(line_num - 1, max(-1, line_num - 5), -1):
-                                    if prev_line_num < 0:
-                                        break
-                                    prev_line = lines[prev_line_num].strip()
-                                    if not prev_line or prev_line.startswith('//'):
-                                        continue
-                                    if (prev_line.startswith('if') and 
-                                        ('PERM_' in prev_line or 'MASK_' in prev_line) and
-                                        not prev_line.startswith('//')):
-                                        lines_to_comment.add(prev_line_num)
-                                        changes_made.append(f"if statement with permission check")
-                                        break
-                                    if prev_line.startswith('}') or 'function' in prev_line.lower():
-                                        break
-                    
-                    # Find and comment out CheckPerms() calls (not function definitions)
-                    for i, line in enumerate(lines):
-                        stripped = line.strip()
-                        if 'CheckPerms' in stripped and '(' in stripped and not stripped.startswith('//'):
-                            # It's a call if it's not a function definition (no opening brace on same/next line)
-                            is_definition = False
-                            if '{' in line:
-                                is_definition = True
-                            else:
-                                # Check next few lines for opening brace
-                                for j in range(i + 1, min(i + 3, len(lines))):
-                                    if '{' in lines[j] and not lines[j].strip().startswith('//'):
-                                        is_definition = True
-                                        break
-                                    if lines[j].strip() and not lines[j].strip().startswith('//'):
-                                        break
-                            
-                            if not is_definition:
-                                lines_to_comment.add(i)
-                                changes_made.append(f"CheckPerms() call")
-                    
-                    # Note: We intentionally do NOT comment out llResetScript() calls
-                    # because they help reset the script state and force reload of sanitized code
-                    
-                    # Comment out all identified lines
-                    for line_num in sorted(lines_to_comment, reverse=True):
-                        line = lines[line_num]
-                        indentation = len(line) - len(line.lstrip())
-                        commented_line = ' ' * indentation + '// DISABLED BY IAR FIXER: ' + line.lstrip()
-                        lines[line_num] = commented_line
-                    
-                    # Reconstruct the content
-                    sanitized_content = '\n'.join(lines)
-                    
-                    # Add header comment if we made changes
-                    if changes_made:
-                        unique_changes = list(set(changes_made))  # Remove duplicates
-                        header = "/* DISABLED BY IAR FIXER - Auto-delete script detected\n"
-                        header += f"   Disabled: {', '.join(unique_changes)}\n"
-                        if had_null_bytes:
-                            header += "   Removed null bytes\n"
-                        header += "*/\n\n"
-                        sanitized_content = header + sanitized_content
-                    
-                    # Write back with the same encoding we used to read, but always as UTF-8 to avoid null bytes
-                    with open(script_file, 'w', encoding='utf-8', newline='\n') as f:
-                        f.write(sanitized_content)
-                    
-                    if verbose:
-                        print(f"   ✓ Disabled {len(llDie_matches)} llDie() call(s)")
-                        if had_null_bytes:
-                            print(f"   ✓ Removed null bytes")
-                
-                disabled_count += 1
-            elif had_null_bytes:
-                # Even if not suspicious, remove null bytes
-                if not dry_run:
-                    with open(script_file, 'w', encoding='utf-8', newline='\n') as f:
-                        f.write(content)
-                    if verbose:
-                        print(f"✓ Cleaned null bytes from {script_file.name}")
-            elif verbose:
-                print(f"✓ Safe script: {script_file.name}")
-                
-        except Exception as e:
-            if verbose:
-                print(f"Error processing {script_file.name}: {e}")
-            continue
-    
-    return disabled_count
+            parent = elem.getparent() if HAVE_LXML else (parents[-1] if parents else None)
+            if parent is not None:
+                # Check if this references a sanitized script
+                for child in elem.iter():
+                    if 'Asset' in child.tag and child.text:
+                        asset_uuid = child.text.strip()
+                        if asset_uuid in sanitized_script_uuids:
+                            parent.remove(elem)
+                            cleared.append(asset_uuid)
+                            break
+        return events.root, cleared
+    return parse
+
+# UUID element under the AssetID of each TaskInventoryItem in an object XML
+if HAVE_LXML:
+    # One compiled XPath, so the walk runs in libxml2 rather than Python
+    find_task_asset_uuids = ET.XPath(
+        "//*[local-name()='TaskInventoryItem']"
+        "/descendant::*[local-name()='AssetID'][1]/*[1][local-name()='UUID']"
+    )
+else:
+    def find_task_asset_uuids(root):
+        for elem in root.iter():
+            if 'TaskInventoryItem' in elem.tag:
+                # Find AssetID element, then UUID within it
+                for asset_id in elem.iter():
+                    if 'AssetID' in asset_id.tag:
+                        for uuid_elem in asset_id:
+                            if 'UUID' in uuid_elem.tag:
+                                yield uuid_elem
+                            break
+                        break
 
 def clear_saved_script_states(folder_path, sanitized_script_uuids, dry_run=False, verbose=False):
     """
@@ -501,91 +942,57 @@ def clear_saved_script_states(folder_path, sanitized_script_uuids, dry_run=False
     if not assets_dir.exists():
         return 0
     
-    # Find all object XML files
-    object_files = list(assets_dir.glob('*_object.xml'))
+    # Find all object XML files (one scandir listing, like iter_xml_files())
+    with os.scandir(assets_dir) as entries:
+        object_files = [Path(entry.path) for entry in entries
+                        if os.path.normcase(entry.name).endswith('_object.xml') and entry.is_file()]
     cleared_count = 0
+    remove_script_states = make_script_state_remover(sanitized_script_uuids)
+    
+    # The UUIDs as raw bytes (utf-8 and both utf-16 byte orders), so objects
+    # that can't mention a sanitized script are skipped without parsing
+    uuid_needles = [asset_uuid.encode(encoding) for asset_uuid in sanitized_script_uuids
+                    for encoding in ('utf-8', 'utf-16-le', 'utf-16-be')]
     
     for object_file in object_files:
         try:
-            # Try multiple encodings
-            encodings = ['utf-8', 'utf-16', 'latin-1', 'cp1252']
-            content = None
-            used_encoding = None
-            
-            for encoding in encodings:
-                try:
-                    with open(object_file, 'r', encoding=encoding) as f:
-                        content = f.read()
-                        used_encoding = encoding
-                        break
-                except UnicodeDecodeError:
-                    continue
-            
-            if content is None:
+            raw = object_file.read_bytes()
+            if not any(needle in raw for needle in uuid_needles):
                 continue
             
             # Parse XML (handle namespaces)
             try:
-                # Register namespaces to avoid issues
-                ET.register_namespace('', '')
-                root = ET.fromstring(content)
-            except ET.ParseError:
+                # Register namespaces to avoid issues (stdlib only; lxml
+                # keeps the document's own prefixes and rejects '')
+                if not HAVE_LXML:
+                    ET.register_namespace('', '')
+                # SavedScriptState elements (with or without namespaces)
+                # are removed while the file is parsed
+                root, cleared_uuids = parse_xml_bytes(raw, remove_script_states)
+            except (ET.ParseError, ValueError):
                 continue
             
-            # Find SavedScriptState elements (search without namespace)
-            script_states_cleared = False
-            
-            # Search for SavedScriptState - handle both with and without namespaces
-            # Use a recursive approach to track parent elements
-            def find_and_remove_script_states(elem, parent=None):
-                nonlocal script_states_cleared
-                if 'SavedScriptState' in elem.tag:
-                    # Check if this references a sanitized script
-                    for child in elem.iter():
-                        if 'Asset' in child.tag and child.text:
-                            asset_uuid = child.text.strip()
-                            if asset_uuid in sanitized_script_uuids:
-                                # Remove this SavedScriptState
-                                if parent is not None:
-                                    parent.remove(elem)
-                                    script_states_cleared = True
-                                    if verbose:
-                                        print(f"  Cleared SavedScriptState for script {asset_uuid} in {object_file.name}")
-                                return
-                # Recursively process children
-                for child in list(elem):
-                    find_and_remove_script_states(child, elem)
-            
-            find_and_remove_script_states(root)
+            script_states_cleared = bool(cleared_uuids)
+            if verbose:
+                for asset_uuid in cleared_uuids:
+                    log.info(f"  Cleared SavedScriptState for script {asset_uuid} in {object_file.name}")
             
-            # Also check TaskInventory items that reference sanitized scripts
-            for elem in root.iter():
-                if 'TaskInventoryItem' in elem.tag:
-                    # Find AssetID element, then UUID within it
-                    for asset_id in elem.iter():
-                        if 'AssetID' in asset_id.tag:
-                            for uuid_elem in asset_id:
-                                if 'UUID' in uuid_elem.tag and uuid_elem.text:
-                                    asset_uuid = uuid_elem.text.strip()
-                                    if asset_uuid in sanitized_script_uuids:
-                                        if verbose:
-                                            print(f"  Found TaskInventoryItem referencing sanitized script {asset_uuid} in {object_file.name}")
-                                    break
-                            break
+            # Also report TaskInventory items that reference sanitized scripts
+            if verbose:
+                for uuid_elem in find_task_asset_uuids(root):
+                    if uuid_elem.text and uuid_elem.text.strip() in sanitized_script_uuids:
+                        log.info(f"  Found TaskInventoryItem referencing sanitized script {uuid_elem.text.strip()} in {object_file.name}")
             
             if script_states_cleared and not dry_run:
-                # Reconstruct XML
-                xml_content = '<?xml version="1.0" encoding="utf-16"?>\n'
-                xml_content += ET.tostring(root, encoding='unicode')
-                
-                with open(object_file, 'w', encoding='utf-8') as f:
-                    f.write(xml_content)
+                # Reconstruct XML as UTF-8 bytes behind the usual declaration and
+                # swap it into place, so an interrupted run can't truncate it
+                write_file_atomic(object_file, XML_DECLARATION_BYTES + ET.tostring(root, encoding='utf-8'))
                 
                 cleared_count += 1
                 
         except Exception as e:
             if verbose:
-                print(f"Error processing {object_file.name}: {e}")
+                log.error(f"Error processing {object_file.name}: {e}")
             continue
     
     return cleared_count
@@ -593,19 +1000,26 @@ def clear_saved_script_states(folder_path, sanitized_script_uuids, dry_run=False
 def main():
     """Main function."""
     args = parse_arguments()
+    logging.basicConfig(level=logging.INFO, format='%(message)s',
+                        handlers=[logging.StreamHandler(sys.stdout)])
     
     # Get permission values and settings
     permissions = get_permission_values(args)
     recursive = get_recursive_setting(args)
     
-    # Find XML files
-    xml_files = find_xml_files(args.folder, recursive)
-    
-    if not xml_files:
-        print(f"No XML files found in '{args.folder}'")
-        return
+    # Find XML files. Only the confirmation prompt needs to know how many
+    # there are up front; otherwise paths stream straight to the workers.
+    confirm = not args.dry_run and not args.no_confirm
+    xml_files = iter_xml_files(args.folder, recursive)
     
-    print(f"Found {len(xml_files)} XML files to process")
+    if confirm:
+        xml_files = list(xml_files)
+        if not xml_files:
+            print(f"No XML files found in '{args.folder}'")
+            return
+        print(f"Found {len(xml_files)} XML files to process")
+    else:
+        print(f"Processing XML files in '{args.folder}'")
     print(f"Using permissions: {permissions}")
     print(f"Recursive processing: {recursive}")
     
@@ -613,7 +1027,7 @@ def main():
         print("DRY RUN MODE - No files will be modified")
     
     # Show what will be done and ask for confirmation (unless --no-confirm or --dry-run)
-    if not args.dry_run and not args.no_confirm:
+    if confirm:
         print(f"\nAbout to modify {len(xml_files)} files with standard full permissions.")
         print("This will set:")
         print(f"  BasePermissions: {permissions['base']}")
@@ -634,44 +1048,75 @@ def main():
             print("Operation cancelled.")
             return
     
-    # Process each XML file
+    # Process the XML files in parallel - each file is independent
     processed_count = 0
     modified_count = 0
     skipped_count = 0
+    not_item_count = 0
     
-    for xml_file in xml_files:
-        processed_count += 1
-        
-        # Check if it's an inventory item XML
-        if not is_inventory_item_xml(xml_file):
-            if args.verbose:
-                print(f"Skipping {xml_file.name} - not an InventoryItem XML")
-            skipped_count += 1
-            continue
-        
-        # Create backup if requested
-        if args.backup and not args.dry_run:
-            backup_path = backup_file(xml_file)
-            if args.verbose:
-                print(f"Created backup: {backup_path.name}")
-        
-        # Apply permissions
-        success, result = apply_permissions_to_xml(
-            xml_file, permissions, args.dry_run, args.verbose
-        )
-        
-        if success:
-            modified_count += 1
+    jobs = args.jobs or os.cpu_count() or 1
+    worker_args = (permissions, args.dry_run, args.verbose, args.backup)
+    
+    if jobs > 1:
+        if confirm:
+            chunksize = max(1, min(64, len(xml_files) // (jobs * 4)))
         else:
-            skipped_count += 1
-            if args.verbose:
-                print(f"Skipped {xml_file.name}: {result}")
+            chunksize = 16
+        # Results come back in completion order - fine, as we only count them
+        pool = multiprocessing.Pool(jobs, initializer=_init_worker,
+                                    initargs=worker_args + (True,))
+        results = pool.imap_unordered(_process_xml_file, xml_files, chunksize=chunksize)
+    else:
+        pool = None
+        _init_worker(*worker_args)
+        results = map(_process_xml_file, xml_files)
+    
+    # The script scan below only touches the scripts in assets/, never these
+    # XML files, so quiet runs start reading them in the background once the
+    # first result shows there's something to process. Its rewrites are held
+    # back until the pass has finished, so a failed pass leaves every script
+    # as it was. Verbose runs leave the scan until after the summary so the
+    # two reports don't interleave.
+    assets_dir = Path(args.folder) / 'assets'
+    background = ThreadPoolExecutor(max_workers=1) if assets_dir.exists() and not args.verbose else None
+    sanitize_future = None
+    pending_script_writes = []
+    
+    try:
+        for xml_file, success, result, messages in results:
+            processed_count += 1
+            if background is not None and sanitize_future is None:
+                sanitize_future = background.submit(sanitize_lsl_scripts, args.folder, args.dry_run,
+                                                    args.verbose, pending_script_writes)
+            for level, message in messages:
+                log.log(level, message)
+            
+            if success:
+                modified_count += 1
+            elif result == NOT_INVENTORY_ITEM:
+                # Already reported by apply_permissions_to_xml() in verbose mode
+                skipped_count += 1
+                not_item_count += 1
+            else:
+                skipped_count += 1
+                if args.verbose:
+                    log.info(f"Skipped {os.path.basename(xml_file)}: {result}")
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        if background is not None:
+            background.shutdown(wait=False)
+    
+    if processed_count == 0:
+        print(f"No XML files found in '{args.folder}'")
+        return
     
     # Summary
     print(f"\nSummary:")
     print(f"  Files processed: {processed_count}")
     print(f"  Files modified: {modified_count}")
-    print(f"  Files skipped: {skipped_count}")
+    print(f"  Files skipped: {skipped_count} ({not_item_count} not InventoryItem XML)")
     
     if args.dry_run and modified_count > 0:
         print(f"\nDRY RUN: {modified_count} files would have been modified")
@@ -680,30 +1125,19 @@ def main():
     
     # NEW: Sanitize LSL scripts if processing an extracted IAR
     # Check if we're in an extracted IAR directory (has assets/ folder)
-    assets_dir = Path(args.folder) / 'assets'
     if assets_dir.exists():
         # Print the step message here so it appears before the script sanitization output
         print("[4/6] Scanning for auto-delete scripts...")
-        import sys
         sys.stdout.flush()  # Ensure message is displayed before script processing
-        disabled_scripts = sanitize_lsl_scripts(args.folder, args.dry_run, args.verbose)
+        # The scan also reports the UUIDs of the scripts it leaves sanitized,
+        # so they needn't be read again to look for its header
+        if sanitize_future is not None:
+            disabled_scripts, sanitized_uuids = sanitize_future.result()
+            write_lsl_scripts(pending_script_writes, args.verbose)
+        else:
+            disabled_scripts, sanitized_uuids = sanitize_lsl_scripts(args.folder, args.dry_run, args.verbose)
         
-        # Collect UUIDs of sanitized scripts
-        sanitized_uuids = set()
         if disabled_scripts > 0:
-            # Find script files that were sanitized
-            for script_file in assets_dir.glob('*.lsl'):
-                try:
-                    with open(script_file, 'r', encoding='utf-8', errors='ignore') as f:
-                        content = f.read(200)  # Read first 200 chars
-                        if 'DISABLED BY IAR FIXER' in content:
-                            # Extract UUID from filename (format: UUID_script.lsl)
-                            uuid_part = script_file.stem.replace('_script', '')
-                            if len(uuid_part) == 36:  # UUID length
-                                sanitized_uuids.add(uuid_part)
-                except:
-                    pass
-            
             # Clear SavedScriptState from object XML files
             if sanitized_uuids:
                 print(f"Clearing SavedScriptState for {len(sanitized_uuids)} sanitized script(s)...")